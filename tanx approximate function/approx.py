@@ -0,0 +1,251 @@
+"""Vectorized approximations of sin, cos, tan, log and x!.
+
+The .ggb files in this folder were the first attempts, tuned by eye in
+GeoGebra. This module evaluates those same curves on NumPy arrays
+(``GEOGEBRA``) next to kernels that reduce the argument to a small
+interval first and then run a short polynomial in Horner form:
+
+    sin/cos/tan  x = n*pi/2 + r, |r| <= pi/4, odd/even polynomial in r
+    log          x = m * 2**e, sqrt(1/2) <= m < sqrt(2), series in atanh
+    x!           Stirling series after shifting the argument up by 8
+
+Every function takes a scalar or an array and evaluates the whole array in
+one call, so bulk geometry can replace a loop of math.cos/math.sin, e.g.
+the ring/slice points drawn in tp.py:
+
+    angles = np.radians(np.arange(8) * 45 + 22.5)
+    xs = center + r_middle * approx.cos(angles)
+    ys = center + r_middle * approx.sin(angles)
+
+Run ``python approx.py`` for the error table and a throughput benchmark.
+The kernels are plain NumPy array arithmetic, a dozen array passes per
+call, so they trail the compiled np.sin/np.log loops and only pay off over
+per-element math calls once arrays reach a few hundred elements (for the 8
+points of tp.py a math loop is still faster). Their gain over the GeoGebra
+curves is accuracy, ~1e-11 instead of ~1e-2. For sin/cos/tan that holds
+for |x| < 1e6: the two-part pi/2 in _reduce leaves ~6e-17 per multiple of
+pi/2, so the error grows with x (7e-9 near 1e8, 6e-2 near 1e15).
+"""
+
+import math
+import time
+
+import numpy as np
+
+# pi/2 split in two so that n*PIO2_HI is exact for the n we see in practice
+PIO2_HI = 1.5707963267341256
+PIO2_LO = 6.077100506506192e-11
+LN2 = math.log(2.0)
+SQRT_HALF = math.sqrt(0.5)
+
+# Taylor coefficients, lowest power first, in powers of r*r
+SIN_COEFFS = [1.0, -1 / 6, 1 / 120, -1 / 5040, 1 / 362880, -1 / 39916800]
+COS_COEFFS = [1.0, -1 / 2, 1 / 24, -1 / 720, 1 / 40320, -1 / 3628800,
+              1 / 479001600]
+# log(m) = 2*s*(1 + s^2/3 + s^4/5 + ...), s = (m - 1) / (m + 1)
+LOG_COEFFS = [1 / (2 * k + 1) for k in range(8)]
+# Stirling series for log(gamma(z)), in powers of 1/z^2 after the 1/z
+STIRLING_COEFFS = [1 / 12, -1 / 360, 1 / 1260, -1 / 1680]
+FACTORIAL_SHIFT = 8
+
+
+def horner(coeffs, x):
+    """Evaluate sum(coeffs[k] * x**k) with one multiply-add per term."""
+    acc = np.full(np.shape(x), coeffs[-1], dtype=np.float64)
+    for c in reversed(coeffs[:-1]):
+        acc *= x
+        acc += c
+    return acc
+
+
+def _reduce(x):
+    """Return (r, q) with x = n*pi/2 + r, |r| <= pi/4 and q = n mod 4."""
+    x = np.asarray(x, dtype=np.float64)
+    n = np.rint(x * (2 / math.pi))
+    r = (x - n * PIO2_HI) - n * PIO2_LO
+    # nan/inf give a nan r anyway, their quadrant does not matter
+    with np.errstate(invalid="ignore"):
+        q = n.astype(np.int64) & 3
+    return r, q
+
+
+def _sin_kernel(r, r2):
+    return r * horner(SIN_COEFFS, r2)
+
+
+def _cos_kernel(r2):
+    return horner(COS_COEFFS, r2)
+
+
+def sin(x):
+    r, q = _reduce(x)
+    r2 = r * r
+    s = _sin_kernel(r, r2)
+    c = _cos_kernel(r2)
+    out = np.where(q & 1, c, s)
+    return np.where(q & 2, -out, out)[()]
+
+
+def cos(x):
+    r, q = _reduce(x)
+    r2 = r * r
+    s = _sin_kernel(r, r2)
+    c = _cos_kernel(r2)
+    out = np.where(q & 1, s, c)
+    return np.where((q + 1) & 2, -out, out)[()]
+
+
+def tan(x):
+    r, q = _reduce(x)
+    r2 = r * r
+    s = _sin_kernel(r, r2)
+    c = _cos_kernel(r2)
+    with np.errstate(divide="ignore"):
+        return np.where(q & 1, -c / s, s / c)[()]
+
+
+def log(x):
+    """Natural log; -inf at 0 and nan for negative input, like np.log."""
+    x = np.asarray(x, dtype=np.float64)
+    m, e = np.frexp(x)
+    small = m < SQRT_HALF
+    m = np.where(small, m * 2, m)
+    e = np.where(small, e - 1, e)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        s = (m - 1) / (m + 1)
+        out = 2 * s * horner(LOG_COEFFS, s * s) + e * LN2
+    out = np.where(x == 0, -np.inf, out)
+    out = np.where(x == np.inf, np.inf, out)
+    return np.where((x < 0) | np.isnan(x), np.nan, out)[()]
+
+
+def factorial(x):
+    """x! = gamma(x + 1) for real x > -1."""
+    x = np.asarray(x, dtype=np.float64)
+    z = x + 1 + FACTORIAL_SHIFT
+    inv = 1 / z
+    with np.errstate(invalid="ignore"):
+        lgam = ((z - 0.5) * log(z) - z + 0.5 * math.log(2 * math.pi)
+                + inv * horner(STIRLING_COEFFS, inv * inv))
+        # undo the shift in log space, gamma(x+1) = gamma(x+1+k) divided by
+        # (x+1)(x+2)...(x+k), so exp only overflows when x! itself does
+        for k in range(1, FACTORIAL_SHIFT + 1):
+            lgam = lgam - log(x + k)
+    lgam = np.where(x == np.inf, np.inf, lgam)
+    with np.errstate(over="ignore"):
+        return np.exp(lgam)[()]
+
+
+# The hand-tuned curves from the .ggb files, each with the interval it was
+# tuned on. They use fractional powers, so they are slower than the kernels
+# above and only hold up inside their interval.
+def _geogebra_sin(x):
+    # "sinx very very close", s(x)
+    p2 = math.pi ** 2
+    return (0.0000036680432 * x * np.abs(p2 - x * x) ** 0.94
+            * (4 * p2 - x * x) ** 2.8197)
+
+
+def _geogebra_cos(x):
+    # "cosx close", r(x)
+    x2 = x * x
+    return 1 - x2 / 2 + x2 * x2 / 24 * (1 + x2) ** -0.04235
+
+
+def _geogebra_tan(x):
+    # "tanx 2", h(x)
+    return x / (1 - (2 * x / math.pi) ** 2) ** 0.895
+
+
+def _geogebra_log10(x):
+    # "log", f(x)
+    return (x ** 0.434 - 1) / x ** 0.214
+
+
+def _geogebra_factorial(x):
+    # "x! closest", f(x)
+    return (x / 2 * (1 + x * x)) ** (0.22 * x)
+
+
+_gamma = np.vectorize(math.gamma, otypes=[np.float64])
+
+
+def _reference_factorial(x):
+    return _gamma(np.asarray(x, dtype=np.float64) + 1)
+
+
+GEOGEBRA = {
+    "sin": (_geogebra_sin, np.sin, (-math.pi, math.pi)),
+    "cos": (_geogebra_cos, np.cos, (-math.pi / 2, math.pi / 2)),
+    "tan": (_geogebra_tan, np.tan, (-1.5, 1.5)),
+    "log10": (_geogebra_log10, np.log10, (0.1, 10.0)),
+    "factorial": (_geogebra_factorial, _reference_factorial, (0.5, 10.0)),
+}
+
+KERNELS = {
+    "sin": (sin, np.sin, (-100.0, 100.0)),
+    "cos": (cos, np.cos, (-100.0, 100.0)),
+    "tan": (tan, np.tan, (-1.5, 1.5)),
+    "log": (log, np.log, (1e-6, 1e6)),
+    "factorial": (factorial, _reference_factorial, (-0.9, 170.0)),
+}
+
+
+def max_error(func, reference, interval, n=100001):
+    """Max absolute and relative error of func against reference.
+
+    Relative error is measured against max(|reference|, 1) so that the zeros
+    of sin/tan do not blow it up.
+    """
+    x = np.linspace(interval[0], interval[1], n)
+    got = func(x)
+    want = reference(x)
+    abs_err = np.abs(got - want)
+    rel_err = abs_err / np.maximum(np.abs(want), 1.0)
+    return float(np.max(abs_err)), float(np.max(rel_err))
+
+
+def throughput(func, x, repeat=5):
+    """Best-of-repeat elements per second for func over the array x."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(x)
+        best = min(best, time.perf_counter() - start)
+    return x.size / best
+
+
+def error_report(table=KERNELS):
+    rows = []
+    for name, (func, reference, interval) in table.items():
+        abs_err, rel_err = max_error(func, reference, interval)
+        rows.append((name, interval, abs_err, rel_err))
+    return rows
+
+
+def benchmark(table=KERNELS, n=1_000_000, repeat=5):
+    rows = []
+    for name, (func, reference, interval) in table.items():
+        x = np.linspace(interval[0], interval[1], n)
+        rows.append((name, throughput(func, x, repeat),
+                     throughput(reference, x, repeat)))
+    return rows
+
+
+def main():
+    for title, table in (("kernels", KERNELS), ("geogebra", GEOGEBRA)):
+        print(f"{title}: max error")
+        print(f"  {'name':10} {'interval':>22} {'abs':>10} {'rel':>10}")
+        for name, (lo, hi), abs_err, rel_err in error_report(table):
+            interval = f"[{lo:g}, {hi:g}]"
+            print(f"  {name:10} {interval:>22} {abs_err:10.2e} {rel_err:10.2e}")
+        print()
+
+    print("throughput, elements/s (reference is numpy, or math.gamma for x!)")
+    print(f"  {'name':10} {'approx':>12} {'reference':>12}")
+    for name, ours, ref in benchmark():
+        print(f"  {name:10} {ours:12.3e} {ref:12.3e}")
+
+
+if __name__ == "__main__":
+    main()
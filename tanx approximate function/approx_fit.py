@@ -0,0 +1,348 @@
+"""Fit polynomial coefficients for the kernels in approx.py.
+
+Instead of nudging exponents in GeoGebra until the curve looks right
+(cosx, cosx 2, cosx close, cosx close2), this fits the polynomial part of
+a kernel directly, either minimax (Remez exchange, smallest worst-case
+error) or least squares on Chebyshev nodes, for a range of degrees:
+
+    python approx_fit.py sin --degrees 5 7 9 11 --budget 1e-9
+    python approx_fit.py cos --method lstsq --curves curves/
+
+For every degree it prints the max absolute error of the kernel over its
+reduced interval (the error both methods fit against), its cost as the
+number of multiply-adds and the measured speed of that polynomial alone.
+With ``--budget`` it picks the cheapest degree that meets the error bound.
+Fitted tables are cached in coeff_cache.json next to this file, so
+rerunning only fits what is new. ``apply`` swaps a table into approx.py
+for the rest of the process.
+"""
+
+import argparse
+import json
+import math
+import os
+
+import numpy as np
+
+import approx
+
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          "coeff_cache.json")
+# bumped when fits change, so old tables in the cache are not reused
+CACHE_VERSION = 2
+
+# name -> (function the kernel must match, parity, interval, table in
+# approx.py, scale). Odd kernels are scale*x*P(x^2), even ones
+# scale*P(x^2), matching how approx.py calls approx.horner.
+TARGETS = {
+    "sin": (np.sin, "odd", (0.0, math.pi / 4), "SIN_COEFFS", 1.0),
+    "cos": (np.cos, "even", (0.0, math.pi / 4), "COS_COEFFS", 1.0),
+    # approx.log computes 2*s*P(s^2) with s = (m-1)/(m+1), and
+    # log(m) = 2*atanh(s)
+    "log": (lambda s: 2 * np.arctanh(s), "odd",
+            (0.0, (1 - approx.SQRT_HALF) / (1 + approx.SQRT_HALF)),
+            "LOG_COEFFS", 2.0),
+}
+
+
+def _powers(parity, degree):
+    if degree < 0:
+        raise ValueError("degree must not be negative")
+    if parity == "odd":
+        if degree % 2 == 0:
+            raise ValueError("odd fits need an odd degree")
+        return list(range(1, degree + 1, 2))
+    if parity == "even":
+        if degree % 2:
+            raise ValueError("even fits need an even degree")
+        return list(range(0, degree + 1, 2))
+    return list(range(degree + 1))
+
+
+def _basis(x, powers):
+    return np.stack([x ** p for p in powers], axis=-1)
+
+
+def _chebyshev_nodes(lo, hi, n):
+    k = np.arange(n)
+    return (lo + hi) / 2 - (hi - lo) / 2 * np.cos(np.pi * k / (n - 1))
+
+
+def _alternating_extrema(x, err, count, level=0.0):
+    """Pick count points of x where err alternates in sign at max |err|.
+
+    Extrema below level are skipped: after a Remez step every real one is at
+    least the levelled error, smaller ones are rounding wiggles.
+    """
+    idx = [0]
+    for i in range(1, len(x) - 1):
+        if (err[i] - err[i - 1]) * (err[i + 1] - err[i]) <= 0:
+            idx.append(i)
+    idx.append(len(x) - 1)
+    idx = [i for i in idx if abs(err[i]) >= level]
+
+    # of consecutive points with the same sign keep the largest
+    picked = []
+    for i in idx:
+        if picked and np.sign(err[i]) == np.sign(err[picked[-1]]):
+            if abs(err[i]) > abs(err[picked[-1]]):
+                picked[-1] = i
+        else:
+            picked.append(i)
+
+    while len(picked) > count:
+        # dropping an end keeps the rest alternating
+        if abs(err[picked[0]]) < abs(err[picked[-1]]):
+            picked.pop(0)
+        else:
+            picked.pop()
+    if len(picked) < count:
+        return None
+    return x[picked]
+
+
+def remez(func, powers, interval, weight=None, grid=20001, max_iter=50,
+          tol=1e-6):
+    """Minimax coefficients of P = sum(c_k * x**powers[k]) for func.
+
+    Minimizes max |weight(x) * (P(x) - func(x))|; no weight means 1.
+    """
+    lo, hi = interval
+    n = len(powers)
+    weight = weight or np.ones_like
+    x = np.linspace(lo, hi, grid)
+    wx, fx = weight(x), func(x)
+    ref = _chebyshev_nodes(lo, hi, n + 1)
+    if wx[0] < 1e-3 * np.max(wx):
+        # the weighted error vanishes at lo, so no extremum sits there
+        ref = _chebyshev_nodes(lo, hi, n + 2)[1:]
+    signs = (-1.0) ** np.arange(n + 1)
+
+    best, best_worst = None, float("inf")
+    for _ in range(max_iter):
+        w = weight(ref)
+        system = np.column_stack([_basis(ref, powers) * w[:, None], signs])
+        solution = np.linalg.solve(system, w * func(ref))
+        coeffs, level = solution[:-1], abs(solution[-1])
+        err = wx * (_basis(x, powers) @ coeffs - fx)
+        worst = np.max(np.abs(err))
+        if worst < best_worst:
+            best, best_worst = coeffs, worst
+        # near rounding noise the exchange stops improving
+        if worst - level <= tol * worst or worst < 1e-15:
+            break
+        new_ref = _alternating_extrema(x, err, n + 1, 0.9 * level)
+        if new_ref is None:
+            break
+        ref = new_ref
+    return best
+
+
+def least_squares(func, powers, interval, weight=None, nodes=2000):
+    """Least-squares coefficients on Chebyshev nodes of the interval."""
+    x = _chebyshev_nodes(interval[0], interval[1], nodes)
+    w = (weight or np.ones_like)(x)
+    coeffs, *_ = np.linalg.lstsq(_basis(x, powers) * w[:, None],
+                                 w * func(x), rcond=None)
+    return coeffs
+
+
+METHODS = {"minimax": remez, "lstsq": least_squares}
+
+
+def fit(func, degree, interval, parity=None, method="minimax", scale=1.0):
+    """Coefficients of P, lowest power first, as approx.horner expects.
+
+    With parity "odd" the fit is func(x) ~ scale*x*P(x^2), with "even" it
+    is func(x) ~ scale*P(x^2), otherwise func(x) ~ scale*P(x). Both methods
+    fit the absolute error of that whole expression. Parity fits are done
+    in t = x^2 on [0, max|x|^2], which keeps high degrees well conditioned.
+    """
+    if method not in METHODS:
+        raise ValueError(f"unknown method {method!r}")
+    powers = _powers(parity, degree)
+    if parity is None:
+        coeffs = METHODS[method](lambda x: func(x) / scale, powers, interval,
+                                 lambda x: np.full_like(x, scale))
+        return [float(c) for c in coeffs]
+
+    top = max(abs(interval[0]), abs(interval[1])) ** 2
+    bottom = 0.0
+
+    if parity == "even":
+        def target(t):
+            return func(np.sqrt(t)) / scale
+
+        def weight(t):
+            return np.full_like(t, scale)
+    else:
+        # scale*x*P(t) - func(x) = scale*x * (P(t) - func(x)/(scale*x)); the
+        # error is 0 at x = 0, so start just above it to keep func(x)/x finite
+        bottom = top * 1e-12
+
+        def target(t):
+            x = np.sqrt(t)
+            return func(x) / (scale * x)
+
+        def weight(t):
+            return scale * np.sqrt(t)
+
+    coeffs = METHODS[method](target, list(range(len(powers))), (bottom, top),
+                             weight)
+    return [float(c) for c in coeffs]
+
+
+def load_cache(path=CACHE_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_cache(cache, path=CACHE_PATH):
+    with open(path, "w") as f:
+        json.dump(cache, f, indent=1, sort_keys=True)
+
+
+def fitted_table(name, degree, method="minimax", cache=None):
+    """Coefficient table for a TARGETS entry, fitted once and then cached."""
+    func, parity, interval, _, scale = TARGETS[name]
+    key = (f"v{CACHE_VERSION}:{name}:{method}:{degree}:"
+           f"{interval[0]!r}:{interval[1]!r}")
+    own_cache = cache is None
+    if own_cache:
+        cache = load_cache()
+    if key not in cache:
+        cache[key] = fit(func, degree, interval, parity, method, scale)
+        if own_cache:
+            save_cache(cache)
+    return cache[key]
+
+
+def apply(name, coeffs):
+    """Make approx.<name> use coeffs; returns the table it replaced."""
+    attr = TARGETS[name][3]
+    old = getattr(approx, attr)
+    setattr(approx, attr, list(coeffs))
+    return old
+
+
+def cost(name, coeffs):
+    """Multiply-adds to evaluate the kernel polynomial for one element."""
+    _, parity, _, _, scale = TARGETS[name]
+    steps = len(coeffs) - 1
+    if parity is not None:
+        steps += 1  # x*x
+    if parity == "odd":
+        steps += 1  # x*P
+    if scale != 1.0:
+        steps += 1
+    return steps
+
+
+def measure(name, coeffs, n=1_000_000, repeat=5):
+    """Max abs error, multiply-adds and elements/s of the kernel polynomial.
+
+    All three cover coeffs alone over the fit interval, as in error_curve:
+    approx.sin and approx.cos also use the other table and the range
+    reduction, which would hide both the error and the cost of a degree.
+    """
+    x, err = error_curve(name, coeffs)
+    x = np.linspace(x[0], x[-1], n)
+    t = x * x if TARGETS[name][1] is not None else x
+    speed = approx.throughput(lambda t: approx.horner(coeffs, t), t, repeat)
+    return float(np.max(np.abs(err))), cost(name, coeffs), speed
+
+
+def error_curve(name, coeffs, n=2001):
+    """(x, error) of the kernel polynomial over its fit interval."""
+    func, parity, (lo, hi), _, scale = TARGETS[name]
+    x = np.linspace(lo, hi, n)
+    if parity == "odd":
+        got = x * approx.horner(coeffs, x * x)
+    elif parity == "even":
+        got = approx.horner(coeffs, x * x)
+    else:
+        got = approx.horner(coeffs, x)
+    return x, scale * got - func(x)
+
+
+def sweep(name, degrees, method="minimax", budget=None):
+    """Fit and measure every degree; returns rows and the cheapest pick.
+
+    Rows are (degree, coeffs, max error, multiply-adds, elements/s). The
+    pick is the row with the fewest multiply-adds whose error is within
+    budget, or None. Timings are shown but not used to pick: one Horner
+    step is close to their noise.
+    """
+    cache = load_cache()
+    rows = []
+    for degree in degrees:
+        coeffs = fitted_table(name, degree, method, cache)
+        rows.append((degree, coeffs) + measure(name, coeffs))
+    save_cache(cache)
+
+    best = None
+    if budget is not None:
+        within = [row for row in rows if row[2] <= budget]
+        if within:
+            best = min(within, key=lambda row: (row[3], row[0]))
+    return rows, best
+
+
+def default_degrees(name):
+    parity = TARGETS[name][1]
+    if parity is None:
+        return list(range(1, 17))
+    return list(range(1 if parity == "odd" else 2, 17, 2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("target", choices=sorted(TARGETS))
+    parser.add_argument("--degrees", type=int, nargs="+")
+    parser.add_argument("--method", choices=sorted(METHODS),
+                        default="minimax")
+    parser.add_argument("--budget", type=float,
+                        help="max absolute error to pick a degree for")
+    parser.add_argument("--curves", metavar="DIR",
+                        help="write x,error CSV files per degree to DIR")
+    args = parser.parse_args()
+
+    degrees = args.degrees or default_degrees(args.target)
+    parity = TARGETS[args.target][1]
+    for degree in degrees:
+        try:
+            _powers(parity, degree)
+        except ValueError as exc:
+            parser.error(f"degree {degree}: {exc}")
+    rows, best = sweep(args.target, degrees, args.method, args.budget)
+
+    print(f"{args.target} ({args.method}): max error and cost per element")
+    print(f"  {'degree':>6} {'terms':>5} {'abs err':>10} {'mul-adds':>8} "
+          f"{'elements/s':>12}")
+    for degree, coeffs, abs_err, steps, speed in rows:
+        print(f"  {degree:6} {len(coeffs):5} {abs_err:10.2e} {steps:8} "
+              f"{speed:12.3e}")
+
+    if args.curves:
+        os.makedirs(args.curves, exist_ok=True)
+        for degree, coeffs, *_ in rows:
+            x, err = error_curve(args.target, coeffs)
+            path = os.path.join(args.curves,
+                                f"{args.target}_{args.method}_{degree}.csv")
+            np.savetxt(path, np.column_stack([x, err]), delimiter=",",
+                       header="x,error", comments="")
+
+    if args.budget is not None:
+        if best is None:
+            print(f"no degree meets {args.budget:g}")
+        else:
+            degree, coeffs, abs_err, steps, _ = best
+            print(f"cheapest within {args.budget:g}: degree {degree}, "
+                  f"error {abs_err:.2e}, {steps} mul-adds")
+            print(f"  {TARGETS[args.target][3]} = {coeffs!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Assertions for approx.py and approx_fit.py; run ``python check_approx.py``.
+
+Each kernel is compared against numpy (or math.gamma for x!) over the
+domain its docstring promises, plus the edge values 0, -0.0, inf and nan.
+The fits are checked on the error they report, which is the one they
+minimize.
+"""
+
+import math
+
+import numpy as np
+
+import approx
+import approx_fit
+
+# relative error, against max(|reference|, 1) as in approx.max_error
+TOLERANCE = 1e-10
+
+
+def check_close(name, got, want, tol=TOLERANCE):
+    got = np.asarray(got, dtype=np.float64)
+    want = np.asarray(want, dtype=np.float64)
+    same_nan = np.isnan(got) == np.isnan(want)
+    assert same_nan.all(), f"{name}: nan mismatch"
+    ok = ~np.isnan(want)
+    inf = np.isinf(want) & ok
+    assert (got[inf] == want[inf]).all(), f"{name}: inf mismatch"
+    finite = ok & ~inf
+    err = np.abs(got[finite] - want[finite])
+    err = err / np.maximum(np.abs(want[finite]), 1.0)
+    worst = float(np.max(err, initial=0.0))
+    assert worst <= tol, f"{name}: error {worst:.2e} > {tol:g}"
+
+
+def check_domains():
+    x = np.linspace(-1e6, 1e6, 200001)
+    check_close("sin", approx.sin(x), np.sin(x))
+    check_close("cos", approx.cos(x), np.cos(x))
+    x = np.linspace(-1.5, 1.5, 100001)
+    check_close("tan", approx.tan(x), np.tan(x))
+    x = np.geomspace(1e-300, 1e300, 100001)
+    check_close("log", approx.log(x), np.log(x))
+    x = np.linspace(-0.99, 170, 100001)
+    check_close("factorial", approx.factorial(x),
+                [math.gamma(v + 1) for v in x])
+    # x >= 160 used to overflow before the shift was undone
+    x = np.linspace(160, 170.6, 1001)
+    check_close("factorial >= 160", approx.factorial(x),
+                [math.gamma(v + 1) for v in x])
+
+
+def check_edges():
+    edges = np.array([0.0, -0.0, np.inf, -np.inf, np.nan])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for name in ("sin", "cos", "tan", "log"):
+            func = getattr(approx, name)
+            check_close(name + " edges", func(edges),
+                        getattr(np, name)(edges))
+    assert approx.factorial(0.0) == approx.factorial(-0.0)
+    check_close("0!", approx.factorial(0.0), 1.0)
+    assert approx.factorial(np.inf) == np.inf
+    assert approx.factorial(172.0) == np.inf
+    assert np.isnan(approx.factorial(np.nan))
+
+
+def check_scalars():
+    for name in ("sin", "cos", "tan", "log", "factorial"):
+        value = getattr(approx, name)(0.5)
+        assert isinstance(value, float), f"{name}: {type(value)} for a float"
+        assert np.shape(getattr(approx, name)([0.5])) == (1,)
+    assert approx.horner([1.0, 0.5], np.arange(3)).tolist() == [1, 1.5, 2]
+
+
+def check_fit():
+    for name, (func, parity, interval, _, scale) in approx_fit.TARGETS.items():
+        for degree in approx_fit.default_degrees(name):
+            errors = {}
+            for method in approx_fit.METHODS:
+                coeffs = approx_fit.fit(func, degree, interval, parity,
+                                        method, scale)
+                _, err = approx_fit.error_curve(name, coeffs)
+                errors[method] = np.max(np.abs(err))
+            # below ~1e-14 both are at rounding level and either may win
+            assert (errors["minimax"] <= errors["lstsq"]
+                    or errors["lstsq"] < 1e-14), f"{name} {degree}: {errors}"
+
+    # the reported log error is that of log(m), not of the atanh series
+    func, parity, interval, _, scale = approx_fit.TARGETS["log"]
+    coeffs = approx_fit.fit(func, 5, interval, parity, "minimax", scale)
+    _, err = approx_fit.error_curve("log", coeffs)
+    old = approx_fit.apply("log", coeffs)
+    try:
+        m = np.linspace(approx.SQRT_HALF, 1 / approx.SQRT_HALF, 20001)
+        kernel_err = np.max(np.abs(approx.log(m) - np.log(m)))
+    finally:
+        approx_fit.apply("log", old)
+    assert abs(kernel_err / np.max(np.abs(err)) - 1) < 0.05, kernel_err
+
+    for parity, degree in (("odd", -1), ("odd", 0), ("odd", 4),
+                           ("even", -2), ("even", 3), (None, -1)):
+        try:
+            approx_fit._powers(parity, degree)
+        except ValueError:
+            continue
+        raise AssertionError(f"{parity} degree {degree} was accepted")
+
+
+def main():
+    with np.errstate(all="raise"):
+        check_scalars()
+    check_domains()
+    check_edges()
+    check_fit()
+    print("approx, approx_fit: all checks passed")
+
+
+if __name__ == "__main__":
+    main()